@@ -1,3 +1,4 @@
+import os
 import sys
 import time
 import argparse
@@ -26,6 +27,12 @@ def parse_args():
         action="store_true", 
         help="Enable debug logging"
     )
+
+    parser.add_argument(
+        "--profile", 
+        action="store_true", 
+        help="Log per-node timings of the Silver/Gold Polars queries"
+    )
     
     return parser.parse_args()
 
@@ -44,6 +51,11 @@ def main():
     else: 
         logger.info("Info logger mode by default.")
 
+    if args.profile:
+        # Read by utils.collect_query
+        os.environ["PROFILE"] = "1"
+        logger.info("Query profiling enabled.")
+
     
     logger.info(f"Starting ETL Pipeline [Env: {args.env.upper()}]")
 
@@ -16,13 +16,29 @@ class BronzeExtractor:
 
 
     @time_execution
-    def download_file_from_url(self, url: str, output_path: Path) -> Tuple[pl.DataFrame, Path]:
+    def download_file_from_url(self, url: str, output_path: Path) -> Tuple[pl.LazyFrame, Path]:
             """
-            Downloads a file directly to disk and loads it into a dataframe.
+            Downloads a file directly to disk and converts it to a Parquet copy next to the raw CSV,
+            so later reads (and Silver scans) skip CSV parsing.
+            
+            Returns:
+                Tuple[pl.LazyFrame, Path]: (Scan over the Parquet copy, Path to the Parquet copy)
             """
             logger.info(f"Downloading data from {url}...")
             
             ensure_directory(output_path)
+
+            parquet_path = output_path.with_suffix(".parquet")
+
+            # Check if already converted (faster to re-read than the CSV)
+            # The copy is only valid while the raw CSV it came from is still there and not newer
+            if (
+                parquet_path.exists()
+                and output_path.exists()
+                and parquet_path.stat().st_mtime >= output_path.stat().st_mtime
+            ):
+                logger.info(f"Parquet copy found at {parquet_path}. Skipping download.")
+                return pl.scan_parquet(parquet_path), parquet_path
             
             # Check if cached
             if output_path.exists():
@@ -48,14 +64,18 @@ class BronzeExtractor:
                         output_path.unlink()
                     raise
 
-            # Read into Polars
-            df = pl.read_csv(
+            # Convert with the streaming engine: the CSV is decoded batch by batch straight into the Parquet
+            # file, so memory stays bounded by the batch size instead of the file size (~2GB for collisions)
+            pl.scan_csv(
                 output_path,
                 ignore_errors=True, 
                 infer_schema_length=10000 
-            )
+            ).sink_parquet(parquet_path)
+
+            # Keep the raw CSV for lineage, downstream reads use the columnar copy
+            logger.info(f"Parquet copy saved to {parquet_path}")
                 
-            return df, output_path
+            return pl.scan_parquet(parquet_path), parquet_path
 
     @time_execution
     def fetch_holidays(self, base_url: str, country: str, years: List[int], output_path: Path) -> Tuple[pl.DataFrame,Path]:
@@ -1,7 +1,8 @@
 import polars as pl
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Union
-from ..utils import setup_logger,clean_output_directory, time_execution
+from ..utils import setup_logger,clean_output_directory, time_execution, timed, collect_query
 
 logger = setup_logger(__name__)
 
@@ -19,15 +20,31 @@ class GoldProcessor:
         "number_of_motorist_injured", "number_of_motorist_killed"
     ]
 
+    # Bits of the Silver 'holiday_impact_mask', unpacked into readable flags in the final output
+    HOLIDAY_IMPACT_BITS = {
+        "high_impact_holiday": 4,
+        "partial_impact_holiday": 2,
+        "low_impact_holiday": 1
+    }
 
-    def _normalize_input(self, input_data: Union[pl.DataFrame, Path], table_name: str = "") -> pl.LazyFrame:
+    def __init__(self, config: dict | None = None):
+        # Load Gold config (optional, defaults keep the processor usable without it)
+        gold_config = (config or {}).get('gold', {})
+        self.emit_csv = gold_config.get('emit_csv', False)
+
+    def _normalize_input(self, input_data: Union[pl.DataFrame, pl.LazyFrame, Path], table_name: str = "") -> pl.LazyFrame:
         """
         If input is DataFrame -> Convert to LazyFrame
+        If input is LazyFrame -> Use it as is (lazy pipeline)
         If input is Path -> Scan Parquet files
         """
         if isinstance(input_data, pl.DataFrame):
             logger.info(f"Input '{table_name}': using DataFrame")
             return input_data.lazy()
+
+        elif isinstance(input_data, pl.LazyFrame):
+            logger.info(f"Input '{table_name}': using LazyFrame")
+            return input_data
             
         elif isinstance(input_data, Path):
             # Assuming partition structure: path/table_name/**/*.parquet
@@ -38,111 +55,165 @@ class GoldProcessor:
         else:
             raise TypeError(f"Unsupported input type for {table_name}: {type(input_data)}")
 
-    @time_execution
-    def _enrich_collisions(
-            self, 
-            lf_collisions: pl.LazyFrame, 
-            lf_holidays: pl.LazyFrame, 
-            lf_weather: pl.LazyFrame
-        ) -> pl.DataFrame:
-            """
-            Joins Collisions with Holidays & Weather, then calculates impact flags (defined by myself)
-            """
-            logger.info("Applying business rules: joining Collisions, Holidays & Weather...")
+    def _build_daily_context(self, lf_holidays: pl.LazyFrame, lf_weather: pl.LazyFrame) -> pl.LazyFrame:
+        """
+        Builds the per-date attributes (weather + holidays), keyed by date.
+        A date with several holidays gets one row per holiday.
+        """
         # Select columns that we find useful.
         # I've had to drop 'year', 'month' to avoid conflicts with those columns in other datasets
-            weather_clean = lf_weather.select([
-                "date", 
-                "temp_max_c", 
-                "temp_min_c", 
-                "has_rain", 
-                "has_snow", 
-                "is_foggy"
+        weather_clean = lf_weather.select([
+            "date", 
+            "temp_max_c", 
+            "temp_min_c", 
+            "has_rain", 
+            "has_snow", 
+            "is_foggy"
+        ])
+
+        # Impact flags already come computed (as a bitmask) from the Silver holidays layer
+        holidays_clean = lf_holidays.select([
+            "date",
+            "holiday_name",
+            "holiday_impact_mask"
+        ])
+
+        return weather_clean.join(holidays_clean, on="date", how="full", coalesce=True)
+
+    def _add_daily_context(self, lf: pl.LazyFrame, lf_daily: pl.LazyFrame) -> pl.LazyFrame:
+        """
+        Left joins the per-date attributes and fills the days without holiday/weather data.
+        """
+        return (
+            lf
+            .join(lf_daily, on="date", how="left")
+            .with_columns([
+                pl.col("holiday_name").fill_null("Non-Holiday"),
+
+                # Non-holidays have no impact bits set
+                pl.col("holiday_impact_mask").fill_null(0),
+
+                # Boolean flags: fill missing days with False
+                pl.col("has_rain").fill_null(False),
+                pl.col("has_snow").fill_null(False),
+                pl.col("is_foggy").fill_null(False),
             ])
-            
-            q = (
-                lf_collisions
-                .filter(pl.col("date").dt.year() >= 2020) # just last 5 years
-                .join(lf_holidays, on="date", how="left")
-                .join(weather_clean, on="date", how="left")
-                .with_columns([
-                    pl.col("holiday_name").fill_null("Non-Holiday"),
-                    
-                    (pl.col("types").list.contains("Public") | pl.col("types").list.contains("Bank"))
-                        .fill_null(False).alias("high_impact_holiday"),
-                    
-                    (pl.col("types").list.contains("School") | pl.col("types").list.contains("Authorities"))
-                        .fill_null(False).alias("partial_impact_holiday"),
-                    
-                    (pl.col("types").list.contains("Optional") | pl.col("types").list.contains("Observance"))
-                        .fill_null(False).alias("low_impact_holiday"),
-
-                    # Boolean flags: fill missing days with False
-                    pl.col("has_rain").fill_null(False),
-                    pl.col("has_snow").fill_null(False),
-                    pl.col("is_foggy").fill_null(False),
-                    
-                    # I am renaming them here slightly for cleaner reading
-                    pl.col("temp_max_c").alias("max_temp"),
-                    pl.col("temp_min_c").alias("min_temp"),
-                ])
-            )
-            
-            return q.collect()
+            # I am renaming them here slightly for cleaner reading
+            .rename({"temp_max_c": "max_temp", "temp_min_c": "min_temp"})
+        )
 
-    @time_execution
-    def _aggregate_stats(self, enriched_df: pl.DataFrame) -> pl.DataFrame:
+    def _daily_stats_query(self, lf_collisions: pl.LazyFrame, lf_daily: pl.LazyFrame) -> pl.LazyFrame:
         """
-        Generates the final gold aggregation.
+        Builds the final gold aggregation query (nothing is executed here).
+        Weather & holiday columns only depend on 'date', so we group by the collision keys
+        and join them back onto the (much smaller) aggregated result.
         """
-        logger.info("Creating gold aggregations...")
-        
-        group_cols = [
-            "date", "borough", "zip_code", "is_weekend", "holiday_name", 
-            "high_impact_holiday", "partial_impact_holiday", "low_impact_holiday",
-            "has_rain","has_snow","is_foggy","max_temp","min_temp"
+        group_cols = ["date", "borough", "zip_code", "is_weekend"]
+
+        # Output layout: group keys, daily context, then the aggregates
+        output_cols = [
+            *group_cols, "holiday_name", *self.HOLIDAY_IMPACT_BITS,
+            "has_rain", "has_snow", "is_foggy", "max_temp", "min_temp",
+            "total_accidents", *self.METRIC_COLS
         ]
 
         return (
-            enriched_df.group_by(group_cols)
+            lf_collisions.group_by(group_cols)
             .agg([
                 pl.len().alias("total_accidents"),
                 pl.col(self.METRIC_COLS).sum()
             ])
+            .pipe(self._add_daily_context, lf_daily)
+            # Unpack the holiday bitmask into one boolean per impact level
+            .with_columns([
+                ((pl.col("holiday_impact_mask") & bit) > 0).alias(flag)
+                for flag, bit in self.HOLIDAY_IMPACT_BITS.items()
+            ])
+            .select(output_cols)
             .sort("date")
         )
+
+    @time_execution
+    def _aggregate_stats(self, lf_collisions: pl.LazyFrame, lf_daily: pl.LazyFrame) -> pl.DataFrame:
+        """
+        Generates the final gold aggregation.
+        This is where the whole query gets materialized.
+        """
+        logger.info("Creating gold aggregations...")
+        return collect_query(self._daily_stats_query(lf_collisions, lf_daily), "gold_daily_stats")
         
     @time_execution
     def process_gold_data(
         self, 
-        collisions_data: Union[pl.DataFrame, Path], 
-        holidays_data: Union[pl.DataFrame, Path], 
-        weather_data: Union[pl.DataFrame, Path], 
-        gold_base_path: Path
+        collisions_data: Union[pl.DataFrame, pl.LazyFrame, Path], 
+        holidays_data: Union[pl.DataFrame, pl.LazyFrame, Path], 
+        weather_data: Union[pl.DataFrame, pl.LazyFrame, Path], 
+        gold_base_path: Path,
+        sink: bool = False,
+        writer_opts: dict | None = None
     ):
         """
         Main entry point for gold processing.
-        Accepts either DataFrames (from previous step) or Paths (from disk).
+        Accepts either DataFrames/LazyFrames (from previous step) or Paths (from disk).
+        With sink=True the query is streamed straight into the output files, never materialized in memory.
+        'writer_opts' are extra Parquet writer options (e.g. row_group_size, statistics, compression).
         """
+        writer_opts = writer_opts or {}
+
         # Normalize Inputs
         lf_collisions = self._normalize_input(collisions_data, "collisions")
         lf_holidays = self._normalize_input(holidays_data, "holidays")
         lf_weather = self._normalize_input(weather_data, "weather")
 
         # Transformation
-        df_enriched = self._enrich_collisions(lf_collisions, lf_holidays,lf_weather)
-        df_gold = self._aggregate_stats(df_enriched)
+        logger.info("Applying business rules: joining Collisions, Holidays & Weather...")
+        lf_daily = self._build_daily_context(lf_holidays, lf_weather)
 
         # Persist
-        clean_output_directory(gold_base_path)
-        
         parquet_path = gold_base_path / "daily_stats.parquet"
         
         # I create this csv in case a business users wants to do an analysis in Excel
         csv_path = gold_base_path / "daily_stats.csv"
 
+        if sink:
+            clean_output_directory(gold_base_path)
+            logger.info(f"Streaming gold data to {gold_base_path}...")
+
+            lf_gold = self._daily_stats_query(lf_collisions, lf_daily)
+
+            # Streaming sink defaults, 'writer_opts' take precedence
+            sink_opts = {
+                "compression": "snappy",
+                "row_group_size": 512 * 512,
+                "statistics": False,
+                **writer_opts
+            }
+
+            with timed("gold_sink"):
+                lf_gold.sink_parquet(parquet_path, **sink_opts)
+                if self.emit_csv:
+                    # Sinking the query twice would run the whole plan twice,
+                    # so the CSV is copied from the (small) Gold Parquet file instead
+                    pl.scan_parquet(parquet_path).sink_csv(csv_path)
+
+            logger.info("Gold layer processing complete.")
+            return
+
+        df_gold = self._aggregate_stats(lf_collisions, lf_daily)
+
+        clean_output_directory(gold_base_path)
+
         logger.info(f"Persisting gold data to {gold_base_path}...")
-        df_gold.write_parquet(parquet_path)
-        df_gold.write_csv(csv_path)
+
+        with timed("gold_persist"):
+            if self.emit_csv:
+                # Different files and Polars releases the GIL, so both formats are written at the same time
+                with ThreadPoolExecutor(max_workers=2) as executor:
+                    parquet_future = executor.submit(df_gold.write_parquet, parquet_path, **writer_opts)
+                    csv_future = executor.submit(df_gold.write_csv, csv_path)
+                    parquet_future.result()
+                    csv_future.result()
+            else:
+                df_gold.write_parquet(parquet_path, **writer_opts)
         
         logger.info("Gold layer processing complete.")
\ No newline at end of file
@@ -1,7 +1,7 @@
 import polars as pl
 from pathlib import Path
 from typing import Union, Tuple
-from ..utils import setup_logger, clean_output_directory,time_execution
+from ..utils import setup_logger, clean_output_directory,time_execution, collect_query
 
 logger = setup_logger(__name__)
 
@@ -10,30 +10,47 @@ class SilverProcessor:
     Handles the Silver Layer lifecycle:
     1. Ingests Bronze Data (Path or DataFrame)
     2. Transforms & Standardizes
-    3. Persists to Disk (in a partitioned Parquet)
+    3. Persists to Disk (in a partitioned Parquet, single file for small tables)
     4. Returns Data for the next layer
     """
+
+    # Raw NOAA GHCN-Daily columns used by the weather transform (the file ships ~30 more)
+    WEATHER_RAW_COLS = ["DATE", "TMAX", "TMIN", "PRCP", "SNOW", "WT01", "WT02"]
+
+    # Shared Parquet writer settings: zstd-3 files with min/max statistics per 100k-row group,
+    # so downstream scans can skip row groups when filtering (e.g. by date)
+    PARQUET_WRITE_OPTIONS = {
+        "compression": "zstd",
+        "compression_level": 3,
+        "statistics": True,
+        "row_group_size": 100_000
+    }
     
     def __init__(self, config: dict):
         # Load Silver config
         self.rename_map = config['silver']['collisions']['rename_map']
-        self.metric_cols = config['silver']['collisions']['metric_cols']
+        # Deduplicated (keeping order) so a repeated entry isn't processed twice
+        self.metric_cols = list(dict.fromkeys(config['silver']['collisions']['metric_cols']))
     
     @time_execution
     def process_collisions(
         self, 
         input_data: Union[pl.DataFrame, Path], 
-        output_path: Path
-    ) -> Tuple[pl.DataFrame, Path]:
+        output_path: Path,
+        lazy: bool = False
+    ) -> Tuple[Union[pl.DataFrame, pl.LazyFrame], Path]:
         """
-        Standardizes collisions, wirtes to Silver (partitioned) and returns the DataFrame
+        Standardizes collisions, wirtes to Silver (partitioned) and returns the DataFrame.
+        With lazy=True nothing is executed nor persisted: the LazyFrame is returned for the next layer.
         """
         
         logger.info("Processing Collisions (Bronze -> Silver)...")
         
         # Check type and load to LazyFrame (could be migrated to a utils.py method)
-        if isinstance(input_data, Path):
-            lf = pl.scan_csv(input_data, ignore_errors=True)
+        if isinstance(input_data, Path) and input_data.suffix == ".parquet":
+            lf = pl.scan_parquet(input_data)
+        elif isinstance(input_data, Path):
+            lf = pl.scan_csv(input_data, ignore_errors=True, low_memory=True)
         elif isinstance(input_data, pl.DataFrame):
             lf = input_data.lazy()
         else:
@@ -43,6 +60,8 @@ class SilverProcessor:
         q = (
             lf
             .filter(pl.col("CRASH DATE").is_not_null())
+            # just last 5 years, checked on the raw "%m/%d/%Y" string so old rows skip date parsing
+            .filter(pl.col("CRASH DATE").str.slice(6, 4).cast(pl.Int32, strict=False) >= 2020)
             .rename(self.rename_map)
             .select(list(self.rename_map.values()))
             .with_columns([
@@ -52,24 +71,32 @@ class SilverProcessor:
                 pl.col(self.metric_cols).fill_null(0).cast(pl.Int32)
             ])
             .with_columns([
-                # is_weekend column
-                (pl.col("date").dt.weekday() >= 6).alias("is_weekend"),
+                # is_weekend column: dates are days since 1970-01-01 (a Thursday), so (days + 3) % 7 gives 0=Mon..6=Sun
+                (((pl.col("date").cast(pl.Int32) + 3) % 7) >= 5).alias("is_weekend"),
                 # Partition keys for writing into disk
                 pl.col("date").dt.year().alias("year"),
-                pl.col("date").dt.month().alias("month")
+                pl.col("date").dt.month().alias("month"),
+                # Low cardinality group-by keys: dictionary encoded so Gold hashes u32 ids instead of strings
+                pl.col("borough").cast(pl.Categorical),
+                pl.col("zip_code").cast(pl.String).cast(pl.Categorical)
             ])
         )
+
+        if lazy:
+            return q, output_path
         
-        # Materialize (we need the DataFrame to persist it)
-        df_silver = q.collect()
+        # Materialize with the streaming engine (processed in batches to keep peak memory low)
+        df_silver = collect_query(q, "silver_collisions")
 
         # Write to disk
         logger.info(f"Persisting Collisions Silver Layer to {output_path}...")
         clean_output_directory(output_path)
         
-        df_silver.write_parquet(
-            output_path,
-            partition_by=["year", "month"]
+        # Streamed partitioned sink: one year=/month= directory per key, written in parallel
+        df_silver.lazy().sink_parquet(
+            pl.PartitionByKey(output_path, by=["year", "month"]),
+            mkdir=True,
+            **self.PARQUET_WRITE_OPTIONS
         )
 
         return df_silver, output_path
@@ -78,10 +105,12 @@ class SilverProcessor:
     def process_holidays(
         self, 
         input_data: Union[pl.DataFrame, Path], 
-        output_path: Path
-    ) -> Tuple[pl.DataFrame, Path]:
+        output_path: Path,
+        lazy: bool = False
+    ) -> Tuple[Union[pl.DataFrame, pl.LazyFrame], Path]:
         """
         Standardizes holidays, writes to Silver and returns the DataFrame.
+        With lazy=True nothing is executed nor persisted: the LazyFrame is returned for the next layer.
         """
         
         logger.info("Processing Holidays (Bronze -> Silver)...")
@@ -99,26 +128,43 @@ class SilverProcessor:
             lf
             .select([
                 pl.col("date").str.to_date("%Y-%m-%d"),
-                pl.col("name").alias("holiday_name"),
+                pl.col("name").cast(pl.Categorical).alias("holiday_name"),
                 pl.col("types").cast(pl.List(pl.String))
             ])
             .with_columns([
+                # Impact flags (defined by myself), computed here on a few dozen rows instead of per collision in Gold
+                # Packed into a single UInt8 bitmask: 4 = high, 2 = partial, 1 = low impact
+                (
+                    (pl.col("types").list.contains("Public") | pl.col("types").list.contains("Bank"))
+                        .fill_null(False).cast(pl.UInt8) * 4
+                    | (pl.col("types").list.contains("School") | pl.col("types").list.contains("Authorities"))
+                        .fill_null(False).cast(pl.UInt8) * 2
+                    | (pl.col("types").list.contains("Optional") | pl.col("types").list.contains("Observance"))
+                        .fill_null(False).cast(pl.UInt8)
+                ).cast(pl.UInt8).alias("holiday_impact_mask"),
+
                 pl.col("date").dt.year().alias("year"),
                 pl.col("date").dt.month().alias("month")
             ])
             .unique()
         )
+
+        if lazy:
+            return q, output_path
         
         # Materialize
-        df_silver = q.collect()
+        df_silver = collect_query(q, "silver_holidays")
 
         # Write to disk
         logger.info(f"Persisting Holidays Silver Layer to {output_path}...")
         clean_output_directory(output_path)
         
+        # Small table (a few dozen rows per year): a single file beats a directory of tiny partitions
         df_silver.write_parquet(
-            output_path,
-            partition_by=["year"]
+            output_path / "holidays.parquet",
+            mkdir=True,
+            use_pyarrow=False,
+            **self.PARQUET_WRITE_OPTIONS
         )
 
         return df_silver, output_path
@@ -127,17 +173,27 @@ class SilverProcessor:
     def process_weather(
             self, 
             input_data: Union[pl.DataFrame, Path], 
-            output_path: Path
-        ) -> Tuple[pl.DataFrame, Path]:
+            output_path: Path,
+            lazy: bool = False
+        ) -> Tuple[Union[pl.DataFrame, pl.LazyFrame], Path]:
             """
             Standardizes NOAA GHCN-Daily weather data, writes to Silver and returns the DataFrame.
+            With lazy=True nothing is executed nor persisted: the LazyFrame is returned for the next layer.
             """
             logger.info("Processing Weather Data (Bronze -> Silver)...")
             
             # Load Input to LazyFrame
-            if isinstance(input_data, Path):
+            if isinstance(input_data, Path) and input_data.suffix == ".parquet":
+                # Bronze Parquet copy has inferred types, the projection below casts the raw columns to String
+                lf = pl.scan_parquet(input_data)
+            elif isinstance(input_data, Path):
                 # 'infer_schema_length=0' we read all cols as String first to avoid errors with messy CSVs
-                lf = pl.scan_csv(input_data, ignore_errors=True, infer_schema_length=0)
+                lf = pl.scan_csv(
+                    input_data,
+                    infer_schema_length=0,
+                    schema_overrides={col: pl.String for col in self.WEATHER_RAW_COLS},
+                    low_memory=True
+                )
             elif isinstance(input_data, pl.DataFrame):
                 lf = input_data.lazy()
             else:
@@ -146,33 +202,39 @@ class SilverProcessor:
             # Transform
             # Data extracted from NOAA GHCN-Daily has to be processed to obtain useful data
 
+            # Filter and projection go first so the optimizer pushes them into the CSV scan
             q = (
                 lf
-                .filter(pl.col("DATE") >= "2020-01-01")
-                .filter(pl.col("DATE").is_not_null())
+                .filter(pl.col("DATE").cast(pl.String) >= "2020-01-01")
+                .select(pl.col(self.WEATHER_RAW_COLS).cast(pl.String))
                 .with_columns([
                     # Convert DATE string to Date type
                     pl.col("DATE").str.to_date("%Y-%m-%d").alias("date"),
-                    
+
+                    # Parse every raw measurement once, the flags below reuse them
+                    pl.col(["TMAX", "TMIN", "PRCP", "SNOW"]).str.strip_chars().cast(pl.Float64, strict=False).name.suffix("_f"),
+                    pl.col(["WT01", "WT02"]).str.strip_chars().cast(pl.Int32, strict=False).name.suffix("_i")
+                ])
+                .with_columns([
                     # Convert Temperature
-                    (pl.col("TMAX").cast(pl.String).str.strip_chars().cast(pl.Float64) / 10).round(1).alias("temp_max_c"),
-                    (pl.col("TMIN").cast(pl.String).str.strip_chars().cast(pl.Float64) / 10).round(1).alias("temp_min_c"),
+                    (pl.col("TMAX_f") / 10).round(1).alias("temp_max_c"),
+                    (pl.col("TMIN_f") / 10).round(1).alias("temp_min_c"),
 
                     # Convert Precipitation
-                    (pl.col("PRCP").cast(pl.String).str.strip_chars().cast(pl.Float64) / 10).alias("precipitation_mm"),
+                    (pl.col("PRCP_f") / 10).alias("precipitation_mm"),
 
-                    pl.col("SNOW").cast(pl.String).str.strip_chars().cast(pl.Float64).alias("snow_mm"),
+                    pl.col("SNOW_f").alias("snow_mm"),
 
                     # --- Fog, rain, snow ---
                     # Logic: If either WT01 or WT02 is "1", it was foggy.
                     pl.any_horizontal(
-                        pl.col("WT01").cast(pl.String).str.strip_chars().cast(pl.Int32, strict=False) == 1,
-                        pl.col("WT02").cast(pl.String).str.strip_chars().cast(pl.Int32, strict=False) == 1
+                        pl.col("WT01_i") == 1,
+                        pl.col("WT02_i") == 1
                     ).fill_null(False).alias("is_foggy"),
 
                     # Basic Boolean flags for Rain/Snow based on measurements
-                    (pl.col("PRCP").cast(pl.String).str.strip_chars().cast(pl.Float64) > 0).fill_null(False).alias("has_rain"),
-                    (pl.col("SNOW").cast(pl.String).str.strip_chars().cast(pl.Float64) > 0).fill_null(False).alias("has_snow")
+                    (pl.col("PRCP_f") > 0).fill_null(False).alias("has_rain"),
+                    (pl.col("SNOW_f") > 0).fill_null(False).alias("has_snow")
                 ])
                 # Select only the clean columns we want to keep
                 .select([
@@ -191,17 +253,22 @@ class SilverProcessor:
                     pl.col("date").dt.month().alias("month")
                 ])
             )
+
+
+            if lazy:
+                return q, output_path
             
-            # Materialize Dataframe 
-            df_silver = q.collect()
+            # Materialize Dataframe (streaming engine)
+            df_silver = collect_query(q, "silver_weather")
 
             # Save to disk/datalake (Partitioned)
             logger.info(f"Persisting Weather Silver Layer to {output_path}...")
             clean_output_directory(output_path)
             
-            df_silver.write_parquet(
-                output_path,
-                partition_by=["year", "month"]
+            df_silver.lazy().sink_parquet(
+                pl.PartitionByKey(output_path, by=["year", "month"]),
+                mkdir=True,
+                **self.PARQUET_WRITE_OPTIONS
             )
 
             return df_silver, output_path
\ No newline at end of file
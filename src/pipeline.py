@@ -1,4 +1,5 @@
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 from .utils import load_config, ensure_directories, setup_logger, validate_dataframe
@@ -8,7 +9,11 @@ from src.layers.gold_processing import GoldProcessor
 
 logger = setup_logger("Pipeline")
 
-def run_pipeline():
+def run_pipeline(lazy: bool = False):
+    """
+    Runs Bronze -> Silver -> Gold.
+    With lazy=True Silver is not persisted: its LazyFrames are fused into a single plan streamed into the Gold files.
+    """
     try:
         # Initial config setup 
         config = load_config()
@@ -16,59 +21,65 @@ def run_pipeline():
         # Ensure base directories exist (bronze, silver, gold) and create them if not
         ensure_directories(config['paths'])
 
-        bronze_processor = BronzeExtractor(config)
         silver_processor = SilverProcessor(config)
-        gold_processor = GoldProcessor() # could add config if it made sense
+        gold_processor = GoldProcessor(config)
 
 # BRONZE (Ingestion) 
         logger.info(" PHASE 1: INGESTION ")
 
         # I am working with both df and files in order to accelerate the processing (with df) and simulate a bronze>silver>gold architecture writing onto S3 for example        
-        
-        # Ingest Collisions
-        logger.info("Ingesting Collisions data...")
+        # The three sources hit different endpoints, so they are downloaded concurrently (IO bound, wall time = slowest download)
         
         # Config source variables
         collisions_url = config['sources']['collisions']['url']
         collisions_filename = config['sources']['collisions']['filename']
         collisions_output_path = Path(config['paths']['bronze']) / collisions_filename
 
-        df_collisions_bronze, path_collisions_bronze = bronze_processor.download_file_from_url(
-            url=collisions_url,
-            output_path=collisions_output_path
-        )
-        
-        validate_dataframe(df_collisions_bronze, "Collisions Bronze", critical_cols=["CRASH DATE"])
-        
-        # Ingest Holidays
-        logger.info("Ingesting Holidays data...")
-        
-        # Config source variables
         holidays_conf = config['sources']['holidays']
         holidays_output_path = Path(config['paths']['bronze']) / holidays_conf['filename']
 
-        df_holidays_bronze, path_holidays_bronze = bronze_processor.fetch_holidays(
-            base_url=holidays_conf['url_base'],
-            country=holidays_conf['country_code'],
-            years=holidays_conf['years'],
-            output_path=holidays_output_path
-        )
-        
-        validate_dataframe(df_holidays_bronze, "Holidays Bronze", critical_cols=["date"])
-        
-        # Ingest historical NYC weather
-        logger.info("Ingesting Collisions data...")
-        
-        # Config source variables
         weather_url = config['sources']['weather']['url']
         weather_filename = config['sources']['weather']['filename']
         weather_output_path = Path(config['paths']['bronze']) / weather_filename
 
-        df_weather_bronze, path_weather_bronze = bronze_processor.download_file_from_url(
-            url=weather_url,
-            output_path=weather_output_path
-        )        
+        # One extractor (so one requests.Session) per concurrent ingest, Session is not documented as thread-safe
+        collisions_extractor = BronzeExtractor(config)
+        holidays_extractor = BronzeExtractor(config)
+        weather_extractor = BronzeExtractor(config)
+
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            # Ingest Collisions
+            logger.info("Ingesting Collisions data...")
+            collisions_future = executor.submit(
+                collisions_extractor.download_file_from_url,
+                url=collisions_url,
+                output_path=collisions_output_path
+            )
+
+            # Ingest Holidays
+            logger.info("Ingesting Holidays data...")
+            holidays_future = executor.submit(
+                holidays_extractor.fetch_holidays,
+                base_url=holidays_conf['url_base'],
+                country=holidays_conf['country_code'],
+                years=holidays_conf['years'],
+                output_path=holidays_output_path
+            )
+
+            # Ingest historical NYC weather
+            logger.info("Ingesting Weather data...")
+            weather_future = executor.submit(
+                weather_extractor.download_file_from_url,
+                url=weather_url,
+                output_path=weather_output_path
+            )
+
+            df_collisions_bronze, path_collisions_bronze = collisions_future.result()
+            df_holidays_bronze, path_holidays_bronze = holidays_future.result()
+            df_weather_bronze, path_weather_bronze = weather_future.result()
         
+        validate_dataframe(df_collisions_bronze, "Collisions Bronze", critical_cols=["CRASH DATE"])
+        validate_dataframe(df_holidays_bronze, "Holidays Bronze", critical_cols=["date"])
         validate_dataframe(df_weather_bronze, "Weather Bronze", critical_cols=["DATE"])
         
 # SILVER (Transform & Standardize) 
@@ -76,23 +87,36 @@ def run_pipeline():
         
         silver_base_path = Path(config['paths']['silver'])
         
-        # Process Collisions
-        df_collisions_silver, path_collisions_silver = silver_processor.process_collisions(
-            input_data=df_collisions_bronze, # path_collisions_bronze (if in production)
-            output_path=silver_base_path / "collisions"
-        )
+        # Polars releases the GIL while running its queries, so the three transforms run in parallel threads
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            # Process Collisions
+            collisions_future = executor.submit(
+                silver_processor.process_collisions,
+                # Bronze Parquet copy: the scan only reads the columns and rows Silver keeps
+                input_data=path_collisions_bronze,
+                output_path=silver_base_path / "collisions",
+                lazy=lazy
+            )
 
-        # Process Holidays        
-        df_holidays_silver, path_holidays_silver = silver_processor.process_holidays(
-            input_data=df_holidays_bronze, # path_holidays_bronze (if in production)
-            output_path=silver_base_path / "holidays"
-        )
-        
-        # Process Weather        
-        df_weather_silver, path_weather_silver = silver_processor.process_weather(
-            input_data=df_weather_bronze, # path_weather_bronze (if in production)
-            output_path=silver_base_path / "weather"
-        )
+            # Process Holidays        
+            holidays_future = executor.submit(
+                silver_processor.process_holidays,
+                input_data=df_holidays_bronze, # path_holidays_bronze (if in production)
+                output_path=silver_base_path / "holidays",
+                lazy=lazy
+            )
+            
+            # Process Weather        
+            weather_future = executor.submit(
+                silver_processor.process_weather,
+                input_data=path_weather_bronze,
+                output_path=silver_base_path / "weather",
+                lazy=lazy
+            )
+
+            df_collisions_silver, path_collisions_silver = collisions_future.result()
+            df_holidays_silver, path_holidays_silver = holidays_future.result()
+            df_weather_silver, path_weather_silver = weather_future.result()
         
 # GOLD (Data modeling) 
         logger.info(" PHASE 3: GOLD LAYER ")
@@ -103,7 +127,8 @@ def run_pipeline():
             collisions_data=df_collisions_silver,
             holidays_data=df_holidays_silver,
             weather_data=df_weather_silver,
-            gold_base_path=Path(config['paths']['gold'])
+            gold_base_path=Path(config['paths']['gold']),
+            sink=lazy # lazy Silver frames are streamed straight into the Gold files
         )
 
         logger.info("Pipeline Finished Successfully.")
@@ -1,8 +1,10 @@
 import logging
+import os
 import polars as pl
 import yaml
 import shutil
 import time
+from contextlib import contextmanager
 from functools import wraps
 from pathlib import Path
 import requests
@@ -10,25 +12,66 @@ from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 
 def setup_logger(name: str) -> logging.Logger:
-    logging.basicConfig(
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        level=logging.INFO
-    )
+    # Configure the root logger only once, the rest of calls just fetch the named logger
+    if not logging.getLogger().handlers:
+        logging.basicConfig(
+            format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+            level=logging.INFO
+        )
     return logging.getLogger(name)
 
 # We generate a "local" logger for the following decorator
 logger = setup_logger("Utils")
 
 def time_execution(func):
+    # Bound once at decoration time instead of looking up the module global on every call
+    _log = logger
+
     @wraps(func)
     def wrapper(*args, **kwargs):
-        start_time = time.time()
+        # perf_counter: monotonic and high resolution (time.time() is ~15ms on Windows)
+        start_time = time.perf_counter()
         result = func(*args, **kwargs)
-        end_time = time.time()
-        logger.info(f"Function '{func.__name__}' took {end_time - start_time:.4f} seconds")
+        end_time = time.perf_counter()
+        # Avoid formatting the message when INFO logs are silenced
+        if _log.isEnabledFor(logging.INFO):
+            _log.info(f"Function '{func.__name__}' took {end_time - start_time:.4f} seconds")
         return result
     return wrapper
 
+@contextmanager
+def timed(name: str):
+    """Times only the wrapped block, e.g. `with timed("gold_persist"):`"""
+    start_time = time.perf_counter()
+    try:
+        yield
+    finally:
+        end_time = time.perf_counter()
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(f"Block '{name}' took {end_time - start_time:.4f} seconds")
+
+def collect_query(q: pl.LazyFrame, name: str) -> pl.DataFrame:
+    """
+    Materializes a LazyFrame with the streaming engine.
+    When PROFILE is set (main.py --profile) it also logs the per-node timings of the query.
+    """
+    if not os.environ.get("PROFILE"):
+        return q.collect(engine="streaming")
+
+    try:
+        df, profile = q.profile(engine="streaming")
+    except pl.exceptions.ComputeError as e:
+        # Polars can't time trivial plans (no nodes to time), we still want the data.
+        # Any other error is a real failure of the query: don't run it a second time
+        if "no data to time" not in str(e):
+            raise
+        logger.warning(f"Could not profile query '{name}': {e}")
+        return q.collect(engine="streaming")
+
+    with pl.Config(tbl_rows=-1, fmt_str_lengths=120):
+        logger.info(f"Query profile for '{name}' (microseconds):\n{profile}")
+    return df
+
 def load_config(config_path: str = "config/config.yaml") -> dict:
     with open(config_path, 'r') as f:
         return yaml.safe_load(f)
@@ -75,27 +118,39 @@ def setup_session() -> requests.Session:
     
     return session        
 
-def validate_dataframe(df: pl.DataFrame, name: str, critical_cols: list | None = None):
+def validate_dataframe(df: pl.DataFrame | pl.LazyFrame, name: str, critical_cols: list | None = None):
     """
     Simple data quality check. Makes sure DataFrame has data and "critical" columns are not null
+    LazyFrames (e.g. Bronze Parquet scans) are checked with streaming queries, never fully loaded into memory
     """
     logger.info(f"Running Data Quality check for '{name}'...")
 
-    # 1. Empty check
-    if df.height == 0:
+    lf = df.lazy()
+    columns = lf.collect_schema().names()
+
+    # 1. Empty check (a Parquet scan answers it from the file metadata)
+    height = lf.select(pl.len()).collect(engine="streaming").item()
+    if height == 0:
         raise ValueError(f"Data Quality error: Input for '{name}' is empty")
 
     # 2. Null check on critical columns
     if critical_cols:
         for col in critical_cols:
-            if col not in df.columns:
+            if col not in columns:
                  logger.warning(f"Skipping null check for missing column '{col}' in '{name}'")
-                 continue
-            
-            null_count = df.select(pl.col(col).null_count()).item()
+
+        # One single pass computing every null count (instead of one .item() roundtrip per column)
+        present_cols = [col for col in dict.fromkeys(critical_cols) if col in columns]
+        null_counts = (
+            lf.select([pl.col(col).null_count().alias(col) for col in present_cols])
+            .collect(engine="streaming")
+            .row(0, named=True)
+        ) if present_cols else {}
+
+        for col, null_count in null_counts.items():
             if null_count > 0:
                 logger.warning(f"DQ Warning: Column '{col}' in '{name}' has {null_count} nulls.")
                 # If we wanted to stop the process:
                 # raise ValueError(f"Data Quality error: column '{col}' contains nulls.")
     
-    logger.info(f"DQ Check passed for '{name}'. Rows: {df.height}")
\ No newline at end of file
+    logger.info(f"DQ Check passed for '{name}'. Rows: {height}")
\ No newline at end of file
@@ -0,0 +1,96 @@
+import pytest
+import polars as pl
+from datetime import date
+from unittest.mock import patch
+
+from src.layers import gold_processing
+from src.layers.gold_processing import GoldProcessor
+
+# --- Shared Fixtures ---
+
+@pytest.fixture(scope="session")
+def gold_processor():
+    """GoldProcessor holds no per-test state, so a single instance is shared."""
+    return GoldProcessor()
+
+@pytest.fixture(scope="module")
+def _gold_clean_patch():
+    """Patches Gold's clean_output_directory once per module instead of once per test."""
+    patcher = patch.object(gold_processing, 'clean_output_directory')
+    mock = patcher.start()
+    yield mock
+    patcher.stop()
+
+@pytest.fixture
+def mock_clean_dir(_gold_clean_patch):
+    """Mock to prevent deleting real directories during tests (reset for every test)."""
+    _gold_clean_patch.reset_mock()
+    return _gold_clean_patch
+
+# --- Gold sample data (explicit schemas for Polars) ---
+# Session scoped: built once and shared, tests must not mutate them (use .clone() if needed)
+
+@pytest.fixture(scope="session")
+def holidays_schema():
+    """Silver holidays schema, only the columns Gold reads."""
+    return pl.Schema({
+        "date": pl.Date,
+        "holiday_name": pl.String,
+        "holiday_impact_mask": pl.UInt8
+    })
+
+@pytest.fixture(scope="session")
+def weather_schema():
+    """Silver weather schema, only the columns Gold reads."""
+    return pl.Schema({
+        "date": pl.Date,
+        "temp_max_c": pl.Float64,
+        "temp_min_c": pl.Float64,
+        "has_rain": pl.Boolean,
+        "has_snow": pl.Boolean,
+        "is_foggy": pl.Boolean
+    })
+
+@pytest.fixture(scope="session")
+def sample_collisions_df():
+    """Creates dummy collision data with a strict schema matching Silver output."""
+    data = {
+        "date": [date(2024, 1, 1), date(2024, 1, 1), date(2019, 12, 31)], 
+        "borough": ["MANHATTAN", "MANHATTAN", "QUEENS"],
+        "zip_code": ["10001", "10001", "11101"],
+        "number_of_persons_injured": [1, 2, 0],
+        "is_weekend": [False, False, False],
+        # Fill the rest of the metrics with 0
+        "number_of_persons_killed": [0, 0, 0],
+        "number_of_pedestrians_injured": [0, 0, 0],
+        "number_of_pedestrians_killed": [0, 0, 0],
+        "number_of_cyclist_injured": [0, 0, 0],
+        "number_of_cyclist_killed": [0, 0, 0],
+        "number_of_motorist_injured": [0, 0, 0],
+        "number_of_motorist_killed": [0, 0, 0]
+    }
+    # Force Date type to avoid inference issues
+    return pl.DataFrame(data, schema_overrides={"date": pl.Date})
+
+@pytest.fixture(scope="session")
+def sample_holidays_df(holidays_schema):
+    """Creates dummy holiday data with the impact flags computed by Silver."""
+    data = {
+        "date": [date(2024, 1, 1)],
+        "holiday_name": ["New Year"],
+        "holiday_impact_mask": [4] # High impact bit (a "Public" holiday)
+    }
+    return pl.DataFrame(data, schema=holidays_schema)
+
+@pytest.fixture(scope="session")
+def sample_weather_df(weather_schema):
+    """Creates dummy weather data with all necessary columns."""
+    data = {
+        "date": [date(2024, 1, 1)],
+        "temp_max_c": [10.5],
+        "temp_min_c": [5.0],
+        "has_rain": [True],
+        "has_snow": [False],
+        "is_foggy": [False]
+    }
+    return pl.DataFrame(data, schema=weather_schema)
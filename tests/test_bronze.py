@@ -1,5 +1,6 @@
 import pytest
 import requests
+import polars as pl
 from unittest.mock import MagicMock, patch, Mock
 from src.layers.bronze_processing import BronzeExtractor 
 
@@ -41,7 +42,8 @@ def test_download_file_success(bronze_extractor, mock_session, tmp_path):
     mock_session.get.return_value = mock_response
 
     # Act
-    df, path = bronze_extractor.download_file_from_url(url, output_path)
+    lf, path = bronze_extractor.download_file_from_url(url, output_path)
+    df = lf.collect() # Bronze returns a scan over the Parquet copy
 
     # Assert
     # Verify that the correct URL was called
@@ -67,7 +69,8 @@ def test_download_file_skips_if_cached(bronze_extractor, mock_session, tmp_path)
         f.write("col1\n999")
         
     # Act
-    df, path = bronze_extractor.download_file_from_url(url, output_path)
+    lf, path = bronze_extractor.download_file_from_url(url, output_path)
+    df = lf.collect()
     
     # Assert
     # IMPORTANT: session.get must NOT have been called
@@ -91,6 +94,52 @@ def test_download_file_network_error_cleanup(bronze_extractor, mock_session, tmp
     # Verify that cleanup was attempted (file should not exist)
     assert not output_path.exists()
 
+def test_download_file_uses_parquet_copy(bronze_extractor, mock_session, tmp_path):
+    """Tests that the Parquet copy is written and then preferred over the raw CSV."""
+    
+    # Arrange
+    url = "http://fake-url.com/data.csv"
+    output_path = tmp_path / "data.csv"
+    
+    with open(output_path, "w") as f:
+        f.write("col1\n999")
+    
+    # Act
+    _, first_path = bronze_extractor.download_file_from_url(url, output_path)
+    pl.DataFrame({"col1": [123]}).write_parquet(first_path) # Only reachable through the copy
+    lf, second_path = bronze_extractor.download_file_from_url(url, output_path)
+    df = lf.collect()
+    
+    # Assert
+    mock_session.get.assert_not_called()
+    assert first_path == second_path == tmp_path / "data.parquet"
+    assert df["col1"][0] == 123
+
+def test_download_file_ignores_stale_parquet_copy(bronze_extractor, mock_session, tmp_path):
+    """Tests that deleting the raw CSV forces a new download instead of serving the old Parquet copy."""
+    
+    # Arrange
+    url = "http://fake-url.com/data.csv"
+    output_path = tmp_path / "data.csv"
+    
+    with open(output_path, "w") as f:
+        f.write("col1\n999")
+    bronze_extractor.download_file_from_url(url, output_path)
+    output_path.unlink()
+
+    mock_response = Mock()
+    mock_response.iter_content.return_value = [b"col1\n1"]
+    mock_session.get.return_value = mock_response
+    
+    # Act
+    lf, path = bronze_extractor.download_file_from_url(url, output_path)
+    df = lf.collect()
+    
+    # Assert
+    mock_session.get.assert_called_once_with(url, stream=True, timeout=60)
+    assert path == tmp_path / "data.parquet"
+    assert df["col1"][0] == 1
+
 # --- Tests for fetch_holidays ---
 
 def test_fetch_holidays_success(bronze_extractor, mock_session, tmp_path):
@@ -2,211 +2,196 @@ import pytest
 import polars as pl
 from pathlib import Path
 from datetime import date
-from unittest.mock import patch
 
-from src.layers import gold_processing
 from src.layers.gold_processing import GoldProcessor
 
+# Right-sized Parquet writer settings for 1-2 row test frames (no compressor or statistics pass)
+_TEST_WRITER_OPTS = {"row_group_size": None, "statistics": False, "compression": "uncompressed"}
+
 # --- Fixtures ---
+# gold_processor, mock_clean_dir, the holidays/weather schemas and the sample_*_df DataFrames are defined in conftest.py
 
-@pytest.fixture
-def gold_processor():
-    return GoldProcessor()
-
-@pytest.fixture
-def mock_clean_dir():
-    """Mock to prevent deleting real directories during tests."""
-    with patch.object(gold_processing, 'clean_output_directory') as mock:
-        yield mock
-
-# --- Helpers with Explicit Schemas (for Polars) ---
-
-def get_sample_collisions():
-    """Creates dummy collision data with a strict schema matching Silver output."""
-    data = {
-        "date": [date(2024, 1, 1), date(2024, 1, 1), date(2019, 12, 31)], 
-        "borough": ["MANHATTAN", "MANHATTAN", "QUEENS"],
-        "zip_code": ["10001", "10001", "11101"],
-        "number_of_persons_injured": [1, 2, 0],
-        "is_weekend": [False, False, False],
-        # Fill the rest of the metrics with 0
-        "number_of_persons_killed": [0, 0, 0],
-        "number_of_pedestrians_injured": [0, 0, 0],
-        "number_of_pedestrians_killed": [0, 0, 0],
-        "number_of_cyclist_injured": [0, 0, 0],
-        "number_of_cyclist_killed": [0, 0, 0],
-        "number_of_motorist_injured": [0, 0, 0],
-        "number_of_motorist_killed": [0, 0, 0]
+@pytest.fixture(scope="module")
+def aggregate_sample(holidays_schema, weather_schema):
+    """
+    Silver collisions for a single day + its per-date context (weather + holidays).
+    Built once per module with explicit schemas (no type inference).
+    """
+    collisions_schema = {
+        "date": pl.Date,
+        "borough": pl.String,
+        "zip_code": pl.String,
+        "is_weekend": pl.Boolean,
+        **{col: pl.Int64 for col in GoldProcessor.METRIC_COLS}
     }
-    # Force Date type to avoid inference issues
-    return pl.DataFrame(data, schema_overrides={"date": pl.Date})
+    collisions_df = pl.DataFrame({
+        "date": [date(2024, 1, 1), date(2024, 1, 1)],
+        "borough": ["MANHATTAN", "MANHATTAN"],
+        "zip_code": ["10001", "10001"],
+        "is_weekend": [False, False],
+        # Metrics
+        "number_of_persons_injured": [1, 2],
+        "number_of_persons_killed": [0, 0],
+        "number_of_pedestrians_injured": [0, 0],
+        "number_of_pedestrians_killed": [0, 0],
+        "number_of_cyclist_injured": [0, 0],
+        "number_of_cyclist_killed": [0, 0],
+        "number_of_motorist_injured": [0, 0],
+        "number_of_motorist_killed": [0, 0]
+    }, schema=collisions_schema)
 
-def get_sample_holidays():
-    """Creates dummy holiday data with strict list schema."""
-    data = {
-        "date": [date(2024, 1, 1)],
-        "holiday_name": ["New Year"],
-        "types": [["National", "Public"]] # List of strings
-    }
-    # Important: define that 'types' is a List of Strings
-    schema = {
-        "date": pl.Date, 
-        "holiday_name": pl.String, 
-        "types": pl.List(pl.String)
+    # Same layout as GoldProcessor._build_daily_context output
+    daily_schema = {
+        **weather_schema,
+        "holiday_name": holidays_schema["holiday_name"],
+        "holiday_impact_mask": holidays_schema["holiday_impact_mask"]
     }
-    return pl.DataFrame(data, schema=schema)
-
-def get_sample_weather():
-    """Creates dummy weather data with all necessary columns."""
-    data = {
+    daily_df = pl.DataFrame({
         "date": [date(2024, 1, 1)],
-        "temp_max_c": [10.5],
+        "temp_max_c": [10.0],
         "temp_min_c": [5.0],
-        "has_rain": [True],
+        "has_rain": [False],
         "has_snow": [False],
-        "is_foggy": [False]
-    }
-    return pl.DataFrame(data, schema_overrides={"date": pl.Date})
+        "is_foggy": [False],
+        "holiday_name": ["Ny"],
+        "holiday_impact_mask": [5] # high + low impact bits
+    }, schema=daily_schema)
+
+    return collisions_df, daily_df
 
 # --- Tests: enrichment logic ---
 
-def test_enrich_collisions_logic(gold_processor):
+@pytest.fixture(scope="module")
+def enrich_cases(sample_collisions_df, sample_holidays_df, sample_weather_df, holidays_schema, weather_schema):
     """
-    Verifies joins, date filtering, and classification logic.
+    Enrichment scenarios: (collisions, holidays, weather) LazyFrames + expected values of the first row.
+    Built once per module and shared by the parametrized test below.
     """
-    # Arrange
-    lf_col = get_sample_collisions().lazy()
-    lf_hol = get_sample_holidays().lazy()
-    lf_wea = get_sample_weather().lazy()
-
-    # Act
-    df_result = gold_processor._enrich_collisions(lf_col, lf_hol, lf_wea)
-
-    # Assert
-    # Date Filter: The 2019 record must disappear
-    assert len(df_result) == 2 
+    # No weather/holiday data: collisions from a day not present in any source
+    lf_col_orphan = pl.DataFrame({"date": [date(2024, 6, 1)]}, schema={"date": pl.Date}).lazy()
     
-    # Joins & Holiday Logic
-    # The two remaining rows are from 2024-01-01
-    row = df_result.row(0, named=True)
-    
-    # Verify join with holidays
-    assert row["holiday_name"] == "New Year"
-    assert row["high_impact_holiday"] == True   # Because "types" contains "Public"
+    # Empty holidays (correct schema)
+    lf_hol_empty = pl.DataFrame(schema=holidays_schema).lazy()
     
-    # Verify join with weather
-    assert row["max_temp"] == 10.5
-    assert row["has_rain"] == True
+    # Empty weather (must have all columns that the code selects)
+    lf_wea_empty = pl.DataFrame(schema=weather_schema).lazy()
+
+    return {
+        # Joins & Holiday Logic: the first two rows are from 2024-01-01
+        # No date filter here (Silver already drops pre-2020 rows): left joins keep every record
+        "normal": (
+            sample_collisions_df.lazy(), sample_holidays_df.lazy(), sample_weather_df.lazy(),
+            3,
+            {
+                "holiday_name": "New Year",
+                "holiday_impact_mask": 4, # High impact bit brought by the join
+                "max_temp": 10.5,
+                "has_rain": True
+            }
+        ),
+        # Left Join works when there is NO weather data: fill_null(False) on flags, temperatures remain null
+        "missing_weather": (
+            lf_col_orphan, lf_hol_empty, lf_wea_empty,
+            1,
+            {
+                "date": date(2024, 6, 1),
+                "holiday_name": "Non-Holiday",
+                "holiday_impact_mask": 0,
+                "max_temp": None,
+                "has_rain": False
+            }
+        )
+    }
 
-def test_enrich_collisions_missing_weather(gold_processor):
+@pytest.mark.parametrize("case", ["normal", "missing_weather"])
+def test_add_daily_context(gold_processor, enrich_cases, case):
     """
-    Verifies that the Left Join works when there is NO weather data.
+    Verifies the daily context joins and null fills (same helpers used by the Gold aggregation).
     """
     # Arrange
-    lf_col = pl.DataFrame({"date": [date(2024, 6, 1)]}, schema={"date": pl.Date}).lazy()
-    
-    # Empty holidays (correct schema)
-    lf_hol = pl.DataFrame(schema={
-        "date": pl.Date, "holiday_name": pl.String, "types": pl.List(pl.String)
-    }).lazy()
-    
-    # Empty weather (must have all columns that the code selects)
-    lf_wea = pl.DataFrame(schema={
-        "date": pl.Date, 
-        "temp_max_c": pl.Float64, 
-        "temp_min_c": pl.Float64,
-        "has_rain": pl.Boolean,
-        "has_snow": pl.Boolean,
-        "is_foggy": pl.Boolean
-    }).lazy()
+    lf_col, lf_hol, lf_wea, expected_rows, expected = enrich_cases[case]
 
     # Act
-    df_result = gold_processor._enrich_collisions(lf_col, lf_hol, lf_wea)
+    # Optimizer passes are pure overhead on 1-3 row inputs, so they are skipped here
+    lf_daily = gold_processor._build_daily_context(lf_hol, lf_wea)
+    df_result = gold_processor._add_daily_context(lf_col, lf_daily).collect(optimizations=pl.QueryOptFlags.none())
 
     # Assert
-    row = df_result.row(0, named=True)
-    
-    assert row["date"] == date(2024, 6, 1)
-    # Verify that fill_null(False) worked
-    assert row["has_rain"] == False 
-    assert row["high_impact_holiday"] == False
-    # Temperatures should remain null
-    assert row["max_temp"] is None
+    assert len(df_result) == expected_rows
+    for col, value in expected.items():
+        assert df_result.item(0, col) == value, col
 
 # --- Tests: aggregation logic ---
 
-def test_aggregate_stats_math(gold_processor):
+def test_aggregate_stats_math(gold_processor, aggregate_sample):
     """
-    Verifies that aggregation correctly sums the metrics.
+    Verifies that aggregation correctly sums the metrics and joins back the daily context.
     """
     # Arrange
-    # Simulate a manually enriched DF
-    enriched_df = pl.DataFrame({
-        "date": [date(2024, 1, 1), date(2024, 1, 1)],
-        "borough": ["MANHATTAN", "MANHATTAN"],
-        "zip_code": ["10001", "10001"],
-        "is_weekend": [False, False],
-        "holiday_name": ["Ny", "Ny"],
-        "high_impact_holiday": [True, True],
-        "partial_impact_holiday": [False, False],
-        "low_impact_holiday": [False, False],
-        "has_rain": [False, False],
-        "has_snow": [False, False],
-        "is_foggy": [False, False],
-        "max_temp": [10.0, 10.0],
-        "min_temp": [5.0, 5.0],
-        # Metrics
-        "number_of_persons_injured": [1, 2],
-        "number_of_persons_killed": [0, 0],
-        "number_of_pedestrians_injured": [0, 0],
-        "number_of_pedestrians_killed": [0, 0],
-        "number_of_cyclist_injured": [0, 0],
-        "number_of_cyclist_killed": [0, 0],
-        "number_of_motorist_injured": [0, 0],
-        "number_of_motorist_killed": [0, 0]
-    }, schema_overrides={"date": pl.Date})
+    collisions_df, daily_df = aggregate_sample
 
     # Act
-    df_gold = gold_processor._aggregate_stats(enriched_df)
+    df_gold = gold_processor._aggregate_stats(collisions_df.lazy(), daily_df.lazy())
 
     # Assert
+    assert df_gold.columns == [
+        "date", "borough", "zip_code", "is_weekend", "holiday_name",
+        "high_impact_holiday", "partial_impact_holiday", "low_impact_holiday",
+        "has_rain", "has_snow", "is_foggy", "max_temp", "min_temp",
+        "total_accidents", *GoldProcessor.METRIC_COLS
+    ]
     assert len(df_gold) == 1
-    row = df_gold.row(0, named=True)
-    assert row["total_accidents"] == 2
-    assert row["number_of_persons_injured"] == 3
+    assert df_gold.item(0, "total_accidents") == 2
+    assert df_gold.item(0, "number_of_persons_injured") == 3
+    assert df_gold.item(0, "max_temp") == 10.0
+    assert df_gold.item(0, "high_impact_holiday") == True
+    assert df_gold.item(0, "partial_impact_holiday") == False
+    assert df_gold.item(0, "low_impact_holiday") == True
 
 # --- Tests: End-to-End ---
 
-def test_process_gold_data_integration(gold_processor, mock_clean_dir, tmp_path):
+def test_process_gold_data_integration(gold_processor, mock_clean_dir, tmp_path, sample_collisions_df, sample_holidays_df, sample_weather_df):
     """
     Tests that the main method orchestrates everything and writes files.
     """
     # Arrange
-    col_df = get_sample_collisions()
-    hol_df = get_sample_holidays()
-    wea_df = get_sample_weather()
-    
     output_dir = tmp_path / "gold_output"
     
     # Manually create the directory because 'clean_output_directory' is mocked
     output_dir.mkdir() 
 
     # Act
-    gold_processor.process_gold_data(col_df, hol_df, wea_df, output_dir)
+    gold_processor.process_gold_data(sample_collisions_df, sample_holidays_df, sample_weather_df, output_dir, writer_opts=_TEST_WRITER_OPTS)
 
     # Assert
-    mock_clean_dir.assert_called_once_with(output_dir)
+    assert mock_clean_dir.call_count == 1 and mock_clean_dir.call_args.args[0] == output_dir
     assert (output_dir / "daily_stats.parquet").exists()
-    assert (output_dir / "daily_stats.csv").exists()
+    # CSV is opt-in through config
+    assert not (output_dir / "daily_stats.csv").exists()
     
-    df_check = pl.read_parquet(output_dir / "daily_stats.parquet")
-    assert len(df_check) > 0
+    # Row count from Parquet metadata, no column data is read
+    assert pl.scan_parquet(output_dir / "daily_stats.parquet").select(pl.len()).collect().item() > 0
 
-def test_normalize_input_path(gold_processor):
+def test_process_gold_data_emit_csv(mock_clean_dir, tmp_path, sample_collisions_df, sample_holidays_df, sample_weather_df):
+    """Tests that the CSV copy is written when enabled in config."""
+    # Arrange
+    gold_processor = GoldProcessor({"gold": {"emit_csv": True}})
+    output_dir = tmp_path / "gold_output"
+    output_dir.mkdir()
+
+    # Act
+    gold_processor.process_gold_data(sample_collisions_df, sample_holidays_df, sample_weather_df, output_dir, writer_opts=_TEST_WRITER_OPTS)
+
+    # Assert
+    assert (output_dir / "daily_stats.parquet").exists()
+    assert (output_dir / "daily_stats.csv").exists()
+
+def test_normalize_input_path(gold_processor, monkeypatch):
     """Unit test for _normalize_input with Path."""
-    with patch("polars.scan_parquet") as mock_scan:
-        path = Path("/dummy/path")
-        gold_processor._normalize_input(path, "test")
-        
-        expected_call = str(path / "**/*.parquet")
-        mock_scan.assert_called_once_with(expected_call)
\ No newline at end of file
+    called = []
+    monkeypatch.setattr(pl, "scan_parquet", lambda p: called.append(p))
+
+    path = Path("/dummy/path")
+    gold_processor._normalize_input(path, "test")
+
+    assert called == [str(path / "**/*.parquet")]
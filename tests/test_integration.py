@@ -2,6 +2,7 @@ import pytest
 import polars as pl
 from unittest.mock import patch, MagicMock
 from pathlib import Path
+from types import SimpleNamespace
 import json
 
 # Asegúrate de que Python encuentre tu módulo
@@ -61,8 +62,6 @@ def mock_config(tmp_path):
                 "metric_cols": [
                     "number_of_persons_injured", 
                     "number_of_persons_killed",
-                    "number_of_persons_injured",
-                    "number_of_persons_killed",
                     "number_of_pedestrians_injured",
                     "number_of_pedestrians_killed",
                     "number_of_cyclist_injured",
@@ -71,6 +70,9 @@ def mock_config(tmp_path):
                     "number_of_motorist_killed"  
                 ]
             }
+        },
+        "gold": {
+            "emit_csv": True
         }
     }
 
@@ -78,66 +80,89 @@ def mock_config(tmp_path):
 # Simulamos los datos crudos que vendrían de internet.
 # Debemos tener cuidado de incluir las columnas que SILVER espera.
 
+# A. Datos Dummy para Collisions (CSV)
+# Codificamos a bytes una sola vez, a nivel de módulo
+# Aseguramos que estén TODAS las columnas que Silver espera en el rename_map
+_CSV_COLLISIONS_BYTES = (
+    "CRASH DATE,CRASH TIME,BOROUGH,ZIP CODE,NUMBER OF PERSONS INJURED,"
+    "NUMBER OF PERSONS KILLED,NUMBER OF PEDESTRIANS INJURED,"
+    "NUMBER OF PEDESTRIANS KILLED,NUMBER OF CYCLIST INJURED,"
+    "NUMBER OF CYCLIST KILLED,NUMBER OF MOTORIST INJURED,"
+    "NUMBER OF MOTORIST KILLED,CONTRIBUTING FACTOR VEHICLE 1\n"
+    "01/01/2024,14:30,MANHATTAN,10001,1,0,0,0,0,0,1,0,Unspecified"
+).encode('utf-8')
+
+# B. Datos Dummy para Weather (CSV)
+# Silver espera: DATE, TMAX, TMIN, PRCP, SNOW, WT01, WT02
+_CSV_WEATHER_BYTES = (
+    "DATE,TMAX,TMIN,PRCP,SNOW,WT01,WT02\n"
+    "2024-01-01,100,50,0,0,0,0"
+).encode('utf-8')
+
+# C. Datos Dummy para Holidays (JSON)
+# Silver espera: date, name, types
+_HOLIDAYS_JSON = [
+    {"date": "2024-01-01", "name": "New Year", "types": ["Public"]}
+]
+
+# Respuesta única para cualquier URL desconocida
+_NOT_FOUND = MagicMock(status_code=404)
+
 @pytest.fixture
 def mock_network(mock_config):
     with patch('requests.Session.get') as mock_get:
         
-        # A. Datos Dummy para Collisions (CSV)
-        # Usamos un string normal y luego .encode('utf-8') para evitar errores de sintaxis
-        # Aseguramos que estén TODAS las columnas que Silver espera en el rename_map
-        csv_text = (
-            "CRASH DATE,CRASH TIME,BOROUGH,ZIP CODE,NUMBER OF PERSONS INJURED,"
-            "NUMBER OF PERSONS KILLED,NUMBER OF PEDESTRIANS INJURED,"
-            "NUMBER OF PEDESTRIANS KILLED,NUMBER OF CYCLIST INJURED,"
-            "NUMBER OF CYCLIST KILLED,NUMBER OF MOTORIST INJURED,"
-            "NUMBER OF MOTORIST KILLED,CONTRIBUTING FACTOR VEHICLE 1\n"
-            "01/01/2024,14:30,MANHATTAN,10001,1,0,0,0,0,0,1,0,Unspecified"
+        # Stubs ligeros: el pipeline solo usa status_code, raise_for_status, iter_content y json
+        # iter_content devuelve bytes, con un iterador nuevo en cada llamada (por si se descarga más de una vez)
+        resp_collisions = SimpleNamespace(
+            status_code=200,
+            raise_for_status=lambda: None,
+            iter_content=lambda **kwargs: iter([_CSV_COLLISIONS_BYTES]),
+            json=lambda: None
         )
-        resp_collisions = MagicMock()
-        resp_collisions.status_code = 200
-        # iter_content debe devolver bytes
-        resp_collisions.iter_content.return_value = [csv_text.encode('utf-8')]
-
-        # B. Datos Dummy para Weather (CSV)
-        # Silver espera: DATE, TMAX, TMIN, PRCP, SNOW, WT01, WT02
-        weather_text = (
-            "DATE,TMAX,TMIN,PRCP,SNOW,WT01,WT02\n"
-            "2024-01-01,100,50,0,0,0,0"
+
+        resp_weather = SimpleNamespace(
+            status_code=200,
+            raise_for_status=lambda: None,
+            iter_content=lambda **kwargs: iter([_CSV_WEATHER_BYTES]),
+            json=lambda: None
         )
-        resp_weather = MagicMock()
-        resp_weather.status_code = 200
-        resp_weather.iter_content.return_value = [weather_text.encode('utf-8')]
-
-        # C. Datos Dummy para Holidays (JSON)
-        # Silver espera: date, name, types
-        json_holidays = [
-            {"date": "2024-01-01", "name": "New Year", "types": ["Public"]}
-        ]
-        resp_holidays = MagicMock()
-        resp_holidays.status_code = 200
-        resp_holidays.json.return_value = json_holidays
-
-        # Lógica de enrutamiento
+
+        resp_holidays = SimpleNamespace(
+            status_code=200,
+            raise_for_status=lambda: None,
+            iter_content=lambda **kwargs: iter([]),
+            json=lambda: _HOLIDAYS_JSON
+        )
+
+        # Lógica de enrutamiento: URL exacta -> respuesta (búsqueda O(1) en un dict)
+        sources = mock_config['sources']
+        holidays_conf = sources['holidays']
+        routes = {
+            sources['collisions']['url']: resp_collisions,
+            sources['weather']['url']: resp_weather,
+            **{
+                f"{holidays_conf['url_base']}/{year}/{holidays_conf['country_code']}": resp_holidays
+                for year in holidays_conf['years']
+            }
+        }
+
         def side_effect(*args, **kwargs):
             url = args[0] if args else kwargs.get('url', '')
-            
-            if "collisions" in url:
-                return resp_collisions
-            elif "weather" in url:
-                return resp_weather
-            elif "holidays" in url:
-                return resp_holidays
-            return MagicMock(status_code=404)
+            return routes.get(url, _NOT_FOUND)
 
         mock_get.side_effect = side_effect
         yield mock_get
 
 # --- 3. EL TEST DE INTEGRACIÓN ---
 
-def test_pipeline_end_to_end(mock_config, mock_network, tmp_path):
+@pytest.mark.integration
+@pytest.mark.parametrize("lazy", [False, True], ids=["eager", "lazy"])
+def test_pipeline_end_to_end(mock_config, mock_network, tmp_path, lazy):
     """
     Ejecuta el Pipeline completo (Bronze -> Silver -> Gold).
     Verifica que se generen los archivos finales.
+    En modo lazy Silver no se persiste y Gold ejecuta el plan completo una sola vez.
     """
     
     # IMPORTANTE: Patcheamos 'load_config' donde se IMPORTA en pipeline.py
@@ -147,7 +172,7 @@ def test_pipeline_end_to_end(mock_config, mock_network, tmp_path):
         
         # --- ACT: Ejecutar Pipeline ---
         print("\n🚀 Iniciando Test de Integración...")
-        run_pipeline()
+        run_pipeline(lazy=lazy)
         print("✅ Pipeline finalizado.")
 
         # --- ASSERT: Verificar Resultados ---
@@ -164,12 +189,13 @@ def test_pipeline_end_to_end(mock_config, mock_network, tmp_path):
         assert csv_file.exists(), "Falta el archivo CSV en Gold"
         
         # 3. Verificar contenido básico (Smoke Test)
-        df = pl.read_parquet(parquet_file)
-        assert len(df) > 0, "El dataset final está vacío"
-        assert "total_accidents" in df.columns
+        # Solo leemos metadatos / las columnas necesarias (projection pushdown)
+        lf = pl.scan_parquet(parquet_file)
+        assert lf.select(pl.len()).collect().item() > 0, "El dataset final está vacío"
+        assert "total_accidents" in lf.collect_schema().names()
         
         # Verificar que el dato mockeado llegó hasta el final
         # Enviamos 1 accidente en collisions y clima correcto.
-        row = df.row(0, named=True)
-        assert row['total_accidents'] == 1
-        assert row['max_temp'] == 10.0 # 100 / 10
\ No newline at end of file
+        df = lf.select("total_accidents", "max_temp").head(1).collect()
+        assert df.item(0, "total_accidents") == 1
+        assert df.item(0, "max_temp") == 10.0 # 100 / 10
\ No newline at end of file
@@ -36,38 +36,48 @@ def silver_processor(mock_config):
     """Instantiates SilverProcessor injecting the mocked config."""
     return SilverProcessor(mock_config)
 
+@pytest.fixture(scope="module")
+def _silver_clean_patch():
+    """Patches Silver's clean_output_directory once per module instead of once per test."""
+    patcher = patch('src.layers.silver_processing.clean_output_directory')
+    mock_clean = patcher.start()
+    yield mock_clean
+    patcher.stop()
+
 @pytest.fixture
-def mock_utils():
+def mock_utils(_silver_clean_patch):
     """Mock to prevent deleting real folders."""
-    with patch('src.layers.silver_processing.clean_output_directory') as mock_clean:
-        yield mock_clean
+    _silver_clean_patch.reset_mock()
+    return _silver_clean_patch
 
 # --- Tests: Collisions ---
 
 def test_process_collisions_logic(silver_processor, mock_utils, mock_config, tmp_path):
     """
     Verifies renaming, null cleaning, and date creation.
-    Does NOT filter by old years (only nulls).
+    Rows with null dates or from before 2020 are dropped.
     """
     
     rename_map = mock_config['silver']['collisions']['rename_map']
     
     # Arrange: Create 'dirty' data in memory
-    input_df = pl.DataFrame({
+    base_data = {
         "CRASH DATE": [
             "12/31/2023", # OK
             "01/01/2024", # OK
-            "01/01/2019", # OK
+            "01/01/2019", # OLD (This must be removed)
             None          # NULL (This must be removed)
         ], 
         "BOROUGH": ["MANHATTAN", None, "QUEENS", "BRONX"], 
         "NUMBER OF PERSONS INJURED": ["1", None, "0", "0"], 
         "CONTRIBUTING FACTOR VEHICLE 1": ["Alcohol", "Speeding", "N/A", "N/A"]
-    }).with_columns([
-        # Generate dummy columns for the rest of the map keys
-        pl.lit(0).alias(col) for col in rename_map.keys() 
-        if col not in ["CRASH DATE", "BOROUGH", "NUMBER OF PERSONS INJURED", "CONTRIBUTING FACTOR VEHICLE 1"]
-    ])
+    }
+    # Dummy columns for the rest of the map keys
+    for col in rename_map.keys():
+        base_data.setdefault(col, [0] * 4)
+
+    # Single constructor call, all columns land in one batch
+    input_df = pl.DataFrame(base_data)
     
     output_path = tmp_path / "collisions_silver"
 
@@ -75,9 +85,9 @@ def test_process_collisions_logic(silver_processor, mock_utils, mock_config, tmp
     df_result, path = silver_processor.process_collisions(input_df, output_path)
 
     # Assert
-    # We expect 3 rows.
-    # None is removed, but 2019, 2023, and 2024 remain.
-    assert len(df_result) == 3
+    # We expect 2 rows.
+    # None and 2019 are removed, 2023 and 2024 remain.
+    assert len(df_result) == 2
     
     # Verify renaming
     assert "crash_date" in df_result.columns
@@ -85,6 +95,7 @@ def test_process_collisions_logic(silver_processor, mock_utils, mock_config, tmp
     
     # Verify null cleaning (row index 1 is 01/01/2024)
     assert df_result["borough"][1] == "UNKNOWN"
+    assert df_result.schema["borough"] == pl.Categorical
     assert df_result["number_of_persons_injured"][1] == 0
     
     # Verify dates (row index 0 is 12/31/2023)
@@ -109,11 +120,30 @@ def test_process_holidays_deduplication(silver_processor, mock_utils, tmp_path):
     # Assert
     assert len(df_result) == 2 
     
-    # Sort by date before verifying
-    df_sorted = df_result.sort("date")
+    # Look up by date, row order after unique() is not guaranteed
+    mapping = dict(zip(df_result["date"].to_list(), df_result["holiday_name"].to_list()))
     
-    assert df_sorted["holiday_name"][0] == "New Year"
-    assert df_sorted["holiday_name"][1] == "Christmas"
+    assert mapping[date(2024, 1, 1)] == "New Year"
+    assert mapping[date(2024, 12, 25)] == "Christmas"
+
+def test_process_holidays_impact_flags(silver_processor, mock_utils, tmp_path):
+    """Verifies the impact flags derived from the holiday 'types'."""
+    # Arrange
+    input_df = pl.DataFrame([
+        {"date": "2024-01-01", "name": "New Year", "types": ["Public"]},
+        {"date": "2024-02-12", "name": "Lincoln's Birthday", "types": ["Observance"]},
+        {"date": "2024-10-14", "name": "Columbus Day", "types": ["School", "Optional"]}
+    ])
+    output_path = tmp_path / "holidays_silver"
+
+    # Act
+    df_result, _ = silver_processor.process_holidays(input_df, output_path)
+
+    # Assert
+    df_sorted = df_result.sort("date")
+
+    # Bits: 4 = high, 2 = partial, 1 = low
+    assert df_sorted["holiday_impact_mask"].to_list() == [4, 1, 3]
 
 # --- Tests: Weather ---
 
@@ -142,19 +172,22 @@ def test_process_weather_logic(silver_processor, mock_utils, tmp_path):
     # Date filter for weather (assuming this filter is maintained)
     assert len(df_result) == 2
     
+    # Index rows by date once
+    rows = {r["date"]: r for r in df_result.iter_rows(named=True)}
+    
     # Check Row 1 (2024-01-01)
-    row1 = df_result.filter(pl.col("date") == date(2024, 1, 1))
-    assert row1["temp_max_c"][0] == 25.0  
-    assert row1["precipitation_mm"][0] == 5.0 
-    assert row1["is_foggy"][0] == True   
-    assert row1["has_rain"][0] == True   
-    assert row1["has_snow"][0] == False
+    row1 = rows[date(2024, 1, 1)]
+    assert row1["temp_max_c"] == 25.0  
+    assert row1["precipitation_mm"] == 5.0 
+    assert row1["is_foggy"] == True   
+    assert row1["has_rain"] == True   
+    assert row1["has_snow"] == False
     
     # Check Row 2 (2024-01-02)
-    row2 = df_result.filter(pl.col("date") == date(2024, 1, 2))
-    assert row2["temp_max_c"][0] == -5.0  
-    assert row2["is_foggy"][0] == True    
-    assert row2["has_snow"][0] == True    
+    row2 = rows[date(2024, 1, 2)]
+    assert row2["temp_max_c"] == -5.0  
+    assert row2["is_foggy"] == True    
+    assert row2["has_snow"] == True    
 
 def test_process_weather_unsupported_input(silver_processor):
     """Verifies that it raises error for unsupported input types."""
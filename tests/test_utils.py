@@ -0,0 +1,77 @@
+import logging
+import pytest
+import polars as pl
+from unittest.mock import MagicMock
+from src.utils import collect_query, timed, validate_dataframe
+
+# --- Tests for collect_query ---
+
+def test_collect_query_default(monkeypatch):
+    """Without PROFILE the query is just collected."""
+    monkeypatch.delenv("PROFILE", raising=False)
+    q = MagicMock()
+
+    result = collect_query(q, "test")
+
+    q.collect.assert_called_once_with(engine="streaming")
+    q.profile.assert_not_called()
+    assert result is q.collect.return_value
+
+def test_collect_query_profile_logs_timings(monkeypatch, caplog):
+    """With PROFILE set the data comes from profile() and the per-node timings are logged."""
+    monkeypatch.setenv("PROFILE", "1")
+    q = pl.LazyFrame({"a": [1, 2, 3]}).filter(pl.col("a") > 1)
+
+    with caplog.at_level(logging.INFO, logger="Utils"):
+        df = collect_query(q, "test")
+
+    assert df["a"].to_list() == [2, 3]
+    assert "Query profile for 'test'" in caplog.text
+
+def test_collect_query_profile_trivial_plan(monkeypatch):
+    """Plans Polars can't time fall back to a plain collect."""
+    monkeypatch.setenv("PROFILE", "1")
+    q = pl.LazyFrame({"a": [1]})
+
+    df = collect_query(q, "test")
+
+    assert df["a"].to_list() == [1]
+
+def test_collect_query_profile_reraises_compute_error(monkeypatch):
+    """A real failure is raised once, the query is not run again."""
+    monkeypatch.setenv("PROFILE", "1")
+    q = MagicMock()
+    q.profile.side_effect = pl.exceptions.ComputeError("Boom!")
+
+    with pytest.raises(pl.exceptions.ComputeError, match="Boom!"):
+        collect_query(q, "test")
+
+    q.collect.assert_not_called()
+
+# --- Tests for timed ---
+
+def test_timed_logs_block(caplog):
+    """The block duration is logged even when the block raises."""
+    with caplog.at_level(logging.INFO, logger="Utils"):
+        with pytest.raises(ValueError):
+            with timed("failing_block"):
+                raise ValueError("Boom!")
+
+    assert "Block 'failing_block' took" in caplog.text
+
+# --- Tests for validate_dataframe ---
+
+def test_validate_dataframe_lazy_input(caplog):
+    """LazyFrames (Bronze Parquet scans) are checked without being collected up front."""
+    lf = pl.LazyFrame({"a": [1, None, 3]})
+
+    with caplog.at_level(logging.WARNING, logger="Utils"):
+        validate_dataframe(lf, "lazy", critical_cols=["a", "missing"])
+
+    assert "Column 'a' in 'lazy' has 1 nulls" in caplog.text
+    assert "missing column 'missing'" in caplog.text
+
+def test_validate_dataframe_empty_raises():
+    """Empty inputs stop the pipeline."""
+    with pytest.raises(ValueError, match="is empty"):
+        validate_dataframe(pl.LazyFrame(schema={"a": pl.Int64}), "empty")